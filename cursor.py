@@ -17,9 +17,13 @@ osu!lazer CursorDance Bot v3.1 - WINDOW DETECTION VERSION
 
 import time
 import math
+import logging
+import bisect
+import heapq
 import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+from tkinter import font as tkfont
 from pynput.mouse import Controller as MouseController
 from pynput.keyboard import Key, Listener as KeyboardListener, Controller as KeyboardController
 import re
@@ -27,20 +31,40 @@ import os
 import zipfile
 import tempfile
 import shutil
-import psutil
 from dataclasses import dataclass
 from typing import List, Tuple, Optional, Dict
 import sys
 import ctypes
-from collections import deque
+from array import array
+
+try:
+    from numba import njit
+    import numpy as np
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Заглушка для njit, если numba не установлена"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import win32gui
+    HAS_PYWIN32 = True
+except ImportError:
+    win32gui = None
+    HAS_PYWIN32 = False
+
+logger = logging.getLogger("cursor")
+logger.setLevel(logging.WARNING)
 
 # Константы osu!
 OSU_WIDTH = 512
 OSU_HEIGHT = 384
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
-SCALE_X = SCREEN_WIDTH / OSU_WIDTH
-SCALE_Y = SCREEN_HEIGHT / OSU_HEIGHT
 
 # Константы тайминга
 HIT_WINDOW_50 = 150.0
@@ -48,6 +72,31 @@ HIT_WINDOW_100 = 100.0
 HIT_WINDOW_300 = 50.0
 PERFECT_WINDOW = 30.0
 
+# Ключевые слова заголовка окна osu! (ищутся за один проход по заголовку)
+TITLE_KEYWORDS_RE = re.compile(r'edit|song select|select|menu')
+
+# Стили танца курсора (индекс передается в dance_offset)
+DANCE_STYLES = ("flow", "wave", "circular", "sharp")
+
+# Таблица синуса на один период для танца: индекс = фаза * SIN_LUT_SCALE, cos - сдвиг на четверть
+SIN_LUT_SIZE = 4096
+SIN_LUT_MASK = SIN_LUT_SIZE - 1
+SIN_LUT_QUARTER = SIN_LUT_SIZE // 4
+SIN_LUT_SCALE = SIN_LUT_SIZE / (2 * math.pi)
+_sin_values = [math.sin(i / SIN_LUT_SCALE) for i in range(SIN_LUT_SIZE)]
+SIN_LUT = np.array(_sin_values) if HAS_NUMBA else array('d', _sin_values)
+del _sin_values
+
+# Максимальный сон главного цикла в паузах карты (нет видимых объектов), сек.
+# Сон и так обрезается до появления следующего объекта, так что на клики потолок не влияет
+IDLE_SLEEP = 0.05
+
+# Время жизни результата проверки активного окна, сек
+FOREGROUND_CACHE_TTL = 0.1
+
+# Буфер потоковой распаковки .osz
+OSZ_COPY_BUFFER = 1024 * 1024
+
 # Windows API для SendInput (работает в osu!lazer)
 PUL = ctypes.POINTER(ctypes.c_ulong)
 
@@ -104,6 +153,95 @@ def run_as_admin():
     except:
         return False
 
+@njit(cache=True, fastmath=True)
+def step_cursor_physics(cx, cy, vx, vy, tx, ty, acceleration, friction, arrival_threshold):
+    """
+    Один шаг физики курсора (как в Auto mode osu!)
+    Возвращает (cx, cy, vx, vy, moved); moved=False - курсор уже у цели
+    """
+    # Вектор до цели
+    dx = tx - cx
+    dy = ty - cy
+    
+    # Квадрат расстояния до цели: корень нужен только если курсор будет двигаться
+    dist_sq = dx*dx + dy*dy
+    
+    if dist_sq < arrival_threshold * arrival_threshold:
+        # Мы уже на месте
+        return cx, cy, vx, vy, False
+    
+    # Нормализованный вектор направления
+    distance = math.sqrt(dist_sq)
+    if distance > 0:
+        inv_distance = 1.0 / distance
+        dir_x = dx * inv_distance
+        dir_y = dy * inv_distance
+    else:
+        dir_x = 0.0
+        dir_y = 0.0
+    
+    # Применяем ускорение (как в Auto)
+    acceleration_strength = min(distance / 100.0, 1.0) * acceleration
+    
+    vx += dir_x * acceleration_strength
+    vy += dir_y * acceleration_strength
+    
+    # Применяем трение (для плавности)
+    vx *= friction
+    vy *= friction
+    
+    # Ограничиваем максимальную скорость
+    max_speed = 50.0
+    speed_sq = vx*vx + vy*vy
+    if speed_sq > max_speed * max_speed:
+        scale = max_speed / math.sqrt(speed_sq)
+        vx *= scale
+        vy *= scale
+    
+    # Обновляем позицию
+    cx += vx
+    cy += vy
+    
+    # Плавное торможение при приближении к цели
+    if distance < 50:
+        decel_factor = distance / 50.0
+        vx *= decel_factor
+        vy *= decel_factor
+    
+    # Ограничиваем координаты экрана
+    cx = max(0.0, min(float(SCREEN_WIDTH), cx))
+    cy = max(0.0, min(float(SCREEN_HEIGHT), cy))
+    
+    return cx, cy, vx, vy, True
+
+@njit(cache=True, fastmath=True)
+def dance_offset(style, t, intensity):
+    """
+    Смещение танца курсора для стиля с индексом style (см. DANCE_STYLES)
+    t - фаза волны, intensity - амплитуда в пикселях
+    Синус и косинус берутся из SIN_LUT (шаг ~0.0015 рад)
+    """
+    phase = t * SIN_LUT_SCALE
+    if style == 0:
+        # Плавные синусоидальные волны (классический Auto)
+        offset_x = int(SIN_LUT[int(phase * 1.2) & SIN_LUT_MASK] * intensity)
+        offset_y = int(SIN_LUT[(int(phase * 1.5) + SIN_LUT_QUARTER) & SIN_LUT_MASK] * intensity)
+    elif style == 1:
+        # Волновое движение
+        offset_x = int(SIN_LUT[int(phase * 1.5) & SIN_LUT_MASK] * intensity)
+        offset_y = int(SIN_LUT[(int(phase * 1.5) + SIN_LUT_SIZE // 6) & SIN_LUT_MASK] * intensity * 0.7)
+    elif style == 2:
+        # Круговое движение (как в Auto при ожидании)
+        radius = intensity * 0.8
+        offset_x = int(SIN_LUT[(int(phase * 2) + SIN_LUT_QUARTER) & SIN_LUT_MASK] * radius)
+        offset_y = int(SIN_LUT[int(phase * 2) & SIN_LUT_MASK] * radius)
+    else:
+        # Резкие движения (но все еще плавнее старой версии)
+        offset_x = int(SIN_LUT[int(phase * 3) & SIN_LUT_MASK] * intensity)
+        offset_y = int(SIN_LUT[(int(phase * 2.5) + SIN_LUT_QUARTER) & SIN_LUT_MASK] * intensity)
+    
+    return offset_x, offset_y
+
 @dataclass
 class TimingPoint:
     """Точка тайминга"""
@@ -137,10 +275,31 @@ class OsuBeatmapParser:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.hit_objects: List[HitObject] = []
-        self.timing_points: List[TimingPoint] = []
+        self._timing_points: Optional[List[TimingPoint]] = None
+        
+        # Поля точек тайминга, нужные для расчета слайдеров
+        self.tp_times = array('d')
+        self.tp_beat_lengths = array('d')
+        self.tp_uninherited = array('b')
         self.difficulty = {}
         self.general = {}
         self.metadata = {}
+        self._sections: Dict[str, str] = {}
+        self._uninherited_times = array('d')
+        self._uninherited_beats = array('d')
+        
+        # Поля объектов в виде параллельных массивов (индекс = индекс в hit_objects)
+        self.times = array('d')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.types = array('b')
+        self.end_times = array('d')
+        
+        # Координаты в экранных пикселях (см. _to_screen)
+        self.xs_screen = array('i')
+        self.ys_screen = array('i')
+        # Коэффициенты пути слайдера на экране (x0, y0, dx, dy, start, 1/duration), None для остальных
+        self.slider_paths: List[Optional[Tuple[float, ...]]] = []
         
     def parse(self) -> bool:
         """Парсинг .osu файла"""
@@ -155,91 +314,113 @@ class OsuBeatmapParser:
             else:
                 return False
             
-            self._parse_general(content)
-            self._parse_metadata(content)
-            self._parse_difficulty(content)
-            self._parse_timing_points(content)
-            self._parse_hit_objects(content)
+            self._sections = self._split_sections(content)
+            self._parse_general()
+            self._parse_metadata()
+            self._parse_difficulty()
+            self._parse_timing_points()
+            self._parse_hit_objects()
             
             self.hit_objects.sort(key=lambda obj: obj.time)
+            self._build_arrays()
             return True
         except Exception as e:
-            print(f"Ошибка парсинга: {e}")
+            logger.error("Ошибка парсинга: %s", e)
             return False
     
-    def _parse_general(self, content: str):
-        section = self._get_section(content, "General")
+    def _parse_general(self):
+        section = self._get_section("General")
         if section:
             self.general = self._parse_key_value(section)
     
-    def _parse_metadata(self, content: str):
-        section = self._get_section(content, "Metadata")
+    def _parse_metadata(self):
+        section = self._get_section("Metadata")
         if section:
             self.metadata = self._parse_key_value(section)
     
-    def _parse_difficulty(self, content: str):
-        section = self._get_section(content, "Difficulty")
+    def _parse_difficulty(self):
+        section = self._get_section("Difficulty")
         if section:
             self.difficulty = self._parse_key_value(section)
     
-    def _parse_timing_points(self, content: str):
-        section = self._get_section(content, "TimingPoints")
-        if not section:
-            return
-        
-        for line in section.strip().split('\n'):
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-            
-            parts = line.split(',')
+    @staticmethod
+    def _timing_point_fields(parts: List[str]) -> tuple:
+        """Поля точки тайминга в порядке TimingPoint; ValueError для некорректной строки"""
+        return (
+            float(parts[0]),
+            float(parts[1]),
+            int(parts[2]) if len(parts) > 2 else 4,
+            int(parts[3]) if len(parts) > 3 else 0,
+            int(parts[4]) if len(parts) > 4 else 0,
+            int(parts[5]) if len(parts) > 5 else 50,
+            int(parts[6]) == 1 if len(parts) > 6 else True,
+            int(parts[7]) if len(parts) > 7 else 0,
+        )
+    
+    def _parse_timing_points(self):
+        # Строка проверяется целиком (как и в timing_points), но хранятся только
+        # нужные дальше поля - в типизированных массивах, без объекта на каждую точку
+        split = str.split
+        fields = self._timing_point_fields
+        for line in self._get_lines("TimingPoints"):
+            parts = split(line, ',')
             if len(parts) < 2:
                 continue
             
             try:
-                self.timing_points.append(TimingPoint(
-                    time=float(parts[0]),
-                    beat_length=float(parts[1]),
-                    meter=int(parts[2]) if len(parts) > 2 else 4,
-                    sample_set=int(parts[3]) if len(parts) > 3 else 0,
-                    sample_index=int(parts[4]) if len(parts) > 4 else 0,
-                    volume=int(parts[5]) if len(parts) > 5 else 50,
-                    uninherited=int(parts[6]) == 1 if len(parts) > 6 else True,
-                    effects=int(parts[7]) if len(parts) > 7 else 0
-                ))
-            except:
+                tp_time, beat_length, _, _, _, _, uninherited, _ = fields(parts)
+            except ValueError:
                 continue
+            
+            self.tp_times.append(tp_time)
+            self.tp_beat_lengths.append(beat_length)
+            self.tp_uninherited.append(uninherited)
+        
+        # Отсортированные uninherited точки для бинарного поиска BPM слайдеров
+        order = sorted((i for i, flag in enumerate(self.tp_uninherited) if flag),
+                       key=self.tp_times.__getitem__)
+        self._uninherited_times = array('d', [self.tp_times[i] for i in order])
+        self._uninherited_beats = array('d', [self.tp_beat_lengths[i] for i in order])
     
-    def _parse_hit_objects(self, content: str):
-        section = self._get_section(content, "HitObjects")
-        if not section:
-            return
+    @property
+    def timing_points(self) -> List[TimingPoint]:
+        """Полные точки тайминга (секция перечитывается при первом обращении)"""
+        if self._timing_points is None:
+            self._timing_points = []
+            for line in self._get_lines("TimingPoints"):
+                parts = line.split(',')
+                if len(parts) < 2:
+                    continue
+                try:
+                    self._timing_points.append(TimingPoint(*self._timing_point_fields(parts)))
+                except ValueError:
+                    continue
+        return self._timing_points
+    
+    def _parse_hit_objects(self):
+        lines = [line for line in self._get_lines("HitObjects") if line.count(',') >= 3]
         
-        for line in section.strip().split('\n'):
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-            
-            parts = line.split(',')
-            if len(parts) < 4:
-                continue
-            
+        rows = [line.split(',', 5) for line in lines]
+        try:
+            columns = self._convert_leading_columns(rows)
+        except ValueError:
+            # Есть битые строки - отбрасываем только их
+            lines = [line for line, row in zip(lines, rows) if self._is_valid_row(row)]
+            columns = self._convert_leading_columns([line.split(',', 5) for line in lines])
+        
+        for line, x, y, time, obj_type, hit_sound in zip(lines, *columns):
             try:
-                x = int(parts[0])
-                y = int(parts[1])
-                time = float(parts[2])
-                obj_type = int(parts[3])
-                hit_sound = int(parts[4]) if len(parts) > 4 else 0
-                
                 if obj_type & 1:
                     self.hit_objects.append(HitObject(
                         x=x, y=y, time=time, type=1, hit_sound=hit_sound
                     ))
                 
                 elif obj_type & 2:
-                    if len(parts) > 5:
-                        slider_data = parts[5]
-                        slider_parts = slider_data.split('|')
+                    # Хвост после пятой колонки режем только для слайдеров и спиннеров
+                    row = line.split(',', 5)
+                    if len(row) > 5:
+                        parts = row[5].split(',')
+                        slider_parts = parts[0].split('|')
                         slider_type = slider_parts[0] if slider_parts else 'L'
                         slider_points = []
                         
@@ -249,17 +430,16 @@ class OsuBeatmapParser:
                                 px, py = map(int, point_str.split(':'))
                                 slider_points.append((px, py))
                         
-                        repeat = int(parts[6]) if len(parts) > 6 else 1
-                        pixel_length = float(parts[7]) if len(parts) > 7 else 0.0
+                        repeat = int(parts[1]) if len(parts) > 1 else 1
+                        pixel_length = float(parts[2]) if len(parts) > 2 else 0.0
                         
-                        active_timing = None
-                        for tp in self.timing_points:
-                            if tp.time <= time and tp.uninherited:
-                                active_timing = tp
+                        # Последняя uninherited точка с tp.time <= time
+                        timing_idx = bisect.bisect_right(self._uninherited_times, time) - 1
+                        beat_length = self._uninherited_beats[timing_idx] if timing_idx >= 0 else 0.0
                         
                         slider_multiplier = float(self.difficulty.get('SliderMultiplier', 1.4))
-                        if active_timing and active_timing.beat_length > 0:
-                            duration = (pixel_length / (100.0 * slider_multiplier)) * active_timing.beat_length * repeat
+                        if beat_length > 0:
+                            duration = (pixel_length / (100.0 * slider_multiplier)) * beat_length * repeat
                             end_time = time + duration
                         else:
                             end_time = time + (pixel_length / 100.0) * 600.0
@@ -271,28 +451,115 @@ class OsuBeatmapParser:
                         ))
                 
                 elif obj_type & 8:
-                    end_time = float(parts[5]) if len(parts) > 5 else time + 1000
+                    row = line.split(',', 6)
+                    end_time = float(row[5]) if len(row) > 5 else time + 1000
                     self.hit_objects.append(HitObject(
                         x=256, y=192, time=time, type=8, hit_sound=hit_sound, end_time=end_time
                     ))
                         
             except Exception as e:
-                print(f"Ошибка парсинга объекта: {e}")
+                logger.debug("Ошибка парсинга объекта: %s", e)
                 continue
     
-    def _get_section(self, content: str, section_name: str) -> Optional[str]:
-        pattern = rf'\[{section_name}\](.*?)(?=\[|\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        return match.group(1).strip() if match else None
+    @staticmethod
+    def _convert_leading_columns(rows: List[List[str]]) -> tuple:
+        """Пакетная конвертация x, y, time, type, hit_sound через map()"""
+        if not rows:
+            return [], [], [], [], []
+        x_col, y_col, time_col, type_col = zip(*(row[:4] for row in rows))
+        hit_sound_col = (row[4] if len(row) > 4 else '0' for row in rows)
+        return (
+            list(map(int, x_col)),
+            list(map(int, y_col)),
+            list(map(float, time_col)),
+            list(map(int, type_col)),
+            list(map(int, hit_sound_col)),
+        )
+    
+    @staticmethod
+    def _is_valid_row(row: List[str]) -> bool:
+        """Проверка ведущих колонок одной строки"""
+        try:
+            OsuBeatmapParser._convert_leading_columns([row])
+            return True
+        except ValueError as e:
+            logger.debug("Ошибка парсинга объекта: %s", e)
+            return False
+    
+    def _build_arrays(self):
+        """Заполнение параллельных массивов по отсортированным объектам"""
+        objs = self.hit_objects
+        self.times = array('d', [obj.time for obj in objs])
+        self.xs = array('i', [obj.x for obj in objs])
+        self.ys = array('i', [obj.y for obj in objs])
+        self.types = array('b', [obj.type for obj in objs])
+        self.end_times = array('d', [obj.time if obj.end_time is None else obj.end_time for obj in objs])
+        self._to_screen()
     
-    def _parse_key_value(self, content: str) -> dict:
-        result = {}
+    def _to_screen(self):
+        """Однократный перевод координат объектов из osu!-пикселей в экранные"""
+        scale_x = SCREEN_WIDTH / OSU_WIDTH
+        scale_y = SCREEN_HEIGHT / OSU_HEIGHT
+        self.xs_screen = array('i', [int(x * scale_x) for x in self.xs])
+        self.ys_screen = array('i', [int(y * scale_y) for y in self.ys])
+        paths = [self._slider_path(obj) if obj.type == 2 else None for obj in self.hit_objects]
+        self.slider_paths = [
+            None if path is None else
+            (path[0] * scale_x, path[1] * scale_y, path[2] * scale_x, path[3] * scale_y, path[4], path[5])
+            for path in paths
+        ]
+    
+    @staticmethod
+    def _slider_path(obj: HitObject) -> Optional[Tuple[float, ...]]:
+        """Предрасчет интерполяции слайдера, чтобы в кадре не делить и не ветвиться"""
+        if not obj.end_time:
+            return None
+        
+        # Упрощенная линейная интерполяция к первой точке
+        if obj.slider_points:
+            end_x, end_y = obj.slider_points[0]
+        else:
+            end_x, end_y = obj.x, obj.y
+        
+        duration = obj.end_time - obj.time
+        inv_duration = 1.0 / duration if duration > 0 else 0.0
+        return (obj.x, obj.y, end_x - obj.x, end_y - obj.y, obj.time, inv_duration)
+    
+    @staticmethod
+    def _split_sections(content: str) -> Dict[str, str]:
+        """Разбивка файла на секции за один проход"""
+        sections = {}
+        name = None
+        lines = []
         for line in content.split('\n'):
-            line = line.strip()
-            if ':' in line and not line.startswith('//'):
-                key, value = line.split(':', 1)
-                result[key.strip()] = value.strip()
-        return result
+            stripped = line.strip()
+            if stripped.startswith('[') and stripped.endswith(']'):
+                if name is not None:
+                    sections[name] = '\n'.join(lines).strip()
+                name = stripped[1:-1]
+                lines = []
+            elif name is not None:
+                lines.append(line)
+        if name is not None:
+            sections[name] = '\n'.join(lines).strip()
+        return sections
+    
+    def _get_section(self, section_name: str) -> Optional[str]:
+        return self._sections.get(section_name)
+    
+    def _get_lines(self, section_name: str) -> List[str]:
+        """Строки секции без пустых строк и комментариев"""
+        section = self._sections.get(section_name)
+        if not section:
+            return []
+        return [line for line in map(str.strip, section.split('\n'))
+                if line and not line.startswith('//')]
+    
+    def _parse_key_value(self, content: str) -> dict:
+        # partition режет строку один раз; строки без ':' и комментарии отбрасываются
+        return {key.strip(): value.strip()
+                for key, sep, value in (line.partition(':') for line in content.split('\n'))
+                if sep and not key.lstrip().startswith('//')}
 
 class WindowsInputHelper:
     """Помощник для Windows SendInput API"""
@@ -304,23 +571,68 @@ class WindowsInputHelper:
     KEYEVENTF_KEYUP = 0x0002
     INPUT_KEYBOARD = 1
     
+    @staticmethod
+    def make_key_input(vk_code, flags) -> Input:
+        """Сборка INPUT для клавиатурного события"""
+        x = Input()
+        x.type = WindowsInputHelper.INPUT_KEYBOARD
+        x.ii.ki.wVk = vk_code
+        x.ii.ki.dwFlags = flags
+        x.ii.ki.dwExtraInfo = ctypes.pointer(_INPUT_EXTRA)
+        return x
+    
     @staticmethod
     def press_key(vk_code):
         """Нажатие клавиши через SendInput"""
-        extra = ctypes.c_ulong(0)
-        ii_ = Input_I()
-        ii_.ki = KeyBdInput(vk_code, 0, WindowsInputHelper.KEYEVENTF_KEYDOWN, 0, ctypes.pointer(extra))
-        x = Input(ctypes.c_ulong(WindowsInputHelper.INPUT_KEYBOARD), ii_)
-        ctypes.windll.user32.SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+        x = _KEY_DOWN_INPUTS.get(vk_code)
+        if x is None:
+            x = WindowsInputHelper.make_key_input(vk_code, WindowsInputHelper.KEYEVENTF_KEYDOWN)
+        _SENDINPUT(1, ctypes.byref(x), _INPUT_SIZE)
     
     @staticmethod
     def release_key(vk_code):
         """Отпускание клавиши через SendInput"""
-        extra = ctypes.c_ulong(0)
-        ii_ = Input_I()
-        ii_.ki = KeyBdInput(vk_code, 0, WindowsInputHelper.KEYEVENTF_KEYUP, 0, ctypes.pointer(extra))
-        x = Input(ctypes.c_ulong(WindowsInputHelper.INPUT_KEYBOARD), ii_)
-        ctypes.windll.user32.SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+        x = _KEY_UP_INPUTS.get(vk_code)
+        if x is None:
+            x = WindowsInputHelper.make_key_input(vk_code, WindowsInputHelper.KEYEVENTF_KEYUP)
+        _SENDINPUT(1, ctypes.byref(x), _INPUT_SIZE)
+    
+
+# Заранее собранные INPUT для Z/X: нажатие не создает ctypes-объектов,
+# а неизменяемые структуры безопасно отправлять из любого потока
+_INPUT_EXTRA = ctypes.c_ulong(0)
+# Клавиши кликов по слоту: RelaxBot._vk_slot 0 - Z, 1 - X
+_VKS = (WindowsInputHelper.VK_Z, WindowsInputHelper.VK_X)
+_KEY_DOWN_INPUTS = {
+    vk: WindowsInputHelper.make_key_input(vk, WindowsInputHelper.KEYEVENTF_KEYDOWN)
+    for vk in _VKS
+}
+_KEY_UP_INPUTS = {
+    vk: WindowsInputHelper.make_key_input(vk, WindowsInputHelper.KEYEVENTF_KEYUP)
+    for vk in _VKS
+}
+_INPUT_SIZE = ctypes.sizeof(Input)
+# Функции user32 связываются один раз; argtypes убирают автоконвертацию на каждом вызове
+try:
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+except AttributeError:
+    _user32 = None  # не Windows
+
+if _user32 is not None:
+    _SENDINPUT = _user32.SendInput
+    _SENDINPUT.argtypes = [ctypes.c_uint, ctypes.POINTER(Input), ctypes.c_int]
+    _SENDINPUT.restype = ctypes.c_uint
+    _FINDWINDOW = _user32.FindWindowW
+    _FINDWINDOW.argtypes = [ctypes.c_wchar_p, ctypes.c_wchar_p]
+    _FINDWINDOW.restype = ctypes.c_void_p
+    # Курсор ставится в пиксельные координаты одним вызовом, без нормализации SendInput
+    _SETCURSORPOS = _user32.SetCursorPos
+    _SETCURSORPOS.argtypes = [ctypes.c_int, ctypes.c_int]
+    _SETCURSORPOS.restype = ctypes.c_int
+else:
+    _SENDINPUT = None
+    _FINDWINDOW = None
+    _SETCURSORPOS = None
 
 class OsuWindowMonitor:
     """Мониторинг окна osu! через Win32 API"""
@@ -334,20 +646,25 @@ class OsuWindowMonitor:
         self.stable_counter = 0  # Счетчик для устранения ложных срабатываний
         self.required_stable_frames = 3  # Требуемое количество стабильных кадров
         
+        # Адаптивный опрос: часто после смены заголовка, реже пока он стабилен
+        self.min_poll_interval = 0.01
+        self.max_poll_interval = 0.2
+        self.poll_backoff = 1.25
+        self._cached_hwnd = None
+        # Даже при живом кэше окна перечисляем заново: игра могла запуститься после браузера
+        self.rescan_interval = 1.0
+        self._last_scan = 0.0
+        
         # Проверка pywin32
-        try:
-            import win32gui
-            import win32process
-            self.has_win32 = True
-        except ImportError:
-            print("ОШИБКА: pywin32 не установлен!")
-            print("Установите: pip install pywin32 --break-system-packages")
-            self.has_win32 = False
+        self.has_win32 = HAS_PYWIN32
+        if not HAS_PYWIN32:
+            logger.warning("ОШИБКА: pywin32 не установлен! "
+                           "Установите: pip install pywin32 --break-system-packages")
     
     def start(self):
         """Запуск мониторинга"""
         if not self.has_win32:
-            print("Невозможно запустить мониторинг без pywin32")
+            logger.error("Невозможно запустить мониторинг без pywin32")
             return False
         
         if self.running:
@@ -356,46 +673,59 @@ class OsuWindowMonitor:
         self.running = True
         self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.thread.start()
-        print("Мониторинг окна osu! запущен")
+        logger.info("Мониторинг окна osu! запущен")
         return True
     
     def stop(self):
         """Остановка мониторинга"""
         self.running = False
-        print("Мониторинг окна остановлен")
+        logger.info("Мониторинг окна остановлен")
     
     def _monitor_loop(self):
         """Главный цикл мониторинга"""
-        import win32gui
+        get_window_text = win32gui.GetWindowText
+        
+        logger.debug("Мониторинг окна запущен...")
         
-        print("Мониторинг окна запущен...")
+        poll_interval = self.min_poll_interval
         
         while self.running:
             try:
+                tick_start = time.perf_counter()
+                
                 # Ищем окно osu!
                 osu_hwnd = self._find_osu_window()
                 
+                # Заголовок не менялся - опрашиваем реже
+                poll_interval = min(self.max_poll_interval, poll_interval * self.poll_backoff)
+                
                 if osu_hwnd:
                     # Получаем заголовок окна
-                    title = win32gui.GetWindowText(osu_hwnd)
+                    title = get_window_text(osu_hwnd)
                     
-                    if title != self.last_title:
+                    if not self._is_osu_title(title):
+                        # Окно больше не похоже на osu! - в следующем тике ищем заново
+                        self._cached_hwnd = None
+                        poll_interval = self.min_poll_interval
+                    elif title != self.last_title:
+                        poll_interval = self.min_poll_interval
+                        
                         # Отладочный вывод
-                        print(f"Заголовок окна: '{title}'")
+                        logger.debug("Заголовок окна: '%s'", title)
                         
                         # Анализируем изменение состояния
                         new_state = self._analyze_window_title(title)
-                        print(f"Состояние: {self.last_state} -> {new_state}")
+                        logger.debug("Состояние: %s -> %s", self.last_state, new_state)
                         
                         # Проверяем переход в режим игры
                         if new_state == "playing" and self.last_state != "playing":
                             self.stable_counter += 1
-                            print(f"Обнаружена игра ({self.stable_counter}/{self.required_stable_frames})")
+                            logger.debug("Обнаружена игра (%d/%d)", self.stable_counter, self.required_stable_frames)
                             
                             # Требуем стабильное состояние перед запуском
                             if self.stable_counter >= self.required_stable_frames:
                                 beatmap_info = self._extract_beatmap_info(title)
-                                print(f"Обнаружено начало карты: {beatmap_info}")
+                                logger.info("Обнаружено начало карты: %s", beatmap_info)
                                 self.callback(beatmap_info)
                                 self.stable_counter = 0
                         else:
@@ -406,37 +736,60 @@ class OsuWindowMonitor:
                         self.last_state = new_state
                         self.last_title = title
                 
-                time.sleep(0.1)  # Проверяем каждые 100мс
+                remaining = poll_interval - (time.perf_counter() - tick_start)
+                if remaining > 0:
+                    time.sleep(remaining)
                 
             except Exception as e:
-                print(f"Ошибка мониторинга окна: {e}")
+                logger.warning("Ошибка мониторинга окна: %s", e)
+                self._cached_hwnd = None
                 time.sleep(1.0)
     
     def _find_osu_window(self):
         """Поиск окна osu!"""
-        import win32gui
+        now = time.monotonic()
+        rescan_due = now - self._last_scan >= self.rescan_interval
+        
+        # Найденное недавно окно еще живо - перечислять окна не нужно
+        # (заголовок проверяет _monitor_loop на каждом тике)
+        if self._cached_hwnd and not rescan_due and win32gui.IsWindow(self._cached_hwnd):
+            return self._cached_hwnd
+        
+        # Быстрая проба по последнему известному заголовку
+        if (not rescan_due and self.last_title and _FINDWINDOW is not None
+                and self._is_osu_title(self.last_title)):
+            hwnd = _FINDWINDOW(None, self.last_title)
+            if hwnd and win32gui.IsWindowVisible(hwnd):
+                self._cached_hwnd = hwnd
+                return hwnd
         
-        osu_windows = []
+        self._last_scan = now
         
-        def callback(hwnd, windows):
+        # Один проход по окнам: выбираем окно с самым коротким заголовком
+        best = [None, None]  # hwnd, title
+        
+        def callback(hwnd, best):
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
-                # Ищем как "osu!", так и "lazer"
-                if 'osu!' in title.lower() or 'lazer' in title.lower():
-                    windows.append((hwnd, title))
+                if OsuWindowMonitor._is_osu_title(title):
+                    if best[1] is None or len(title) < len(best[1]):
+                        best[0] = hwnd
+                        best[1] = title
             return True
         
-        win32gui.EnumWindows(callback, osu_windows)
-        
-        if osu_windows:
-            # Сортируем по имени окна, чтобы выбрать более подходящее
-            osu_windows.sort(key=lambda x: len(x[1]))
-            for hwnd, title in osu_windows:
-                print(f"Найдено окно: '{title}'")
-            
-            return osu_windows[0][0]
+        win32gui.EnumWindows(callback, best)
         
-        return None
+        hwnd, title = best
+        if hwnd:
+            logger.debug("Найдено окно: '%s'", title)
+        self._cached_hwnd = hwnd
+        return hwnd
+    
+    @staticmethod
+    def _is_osu_title(title: str) -> bool:
+        """Заголовок похож на окно osu! (ищем как "osu!", так и "lazer")"""
+        title_lower = title.lower()
+        return 'osu!' in title_lower or 'lazer' in title_lower
     
     def _analyze_window_title(self, title: str) -> str:
         """
@@ -448,22 +801,22 @@ class OsuWindowMonitor:
         - osu! - Artist - Title [Difficulty] (игра началась)
         - osu! - edit - Artist - Title [Difficulty] (редактор)
         """
-        title_lower = title.lower()
+        keywords = set(TITLE_KEYWORDS_RE.findall(title.lower()))
         
         # Проверяем признаки редактора
-        if 'edit' in title_lower:
+        if 'edit' in keywords:
             return "editing"
         
         # Проверяем признаки выбора карты
-        if 'song select' in title_lower or title == "osu!":
+        if 'song select' in keywords or title == "osu!":
             return "selecting"
         
         # Проверяем признаки игры
         # В osu! во время игры формат: Artist - Title [Difficulty]
         # или в некоторых версиях: Artist - Title (название карты) [Difficulty]
         if '[' in title and ']' in title:
-            # Исключаем меню и редактор
-            if 'menu' not in title_lower and 'edit' not in title_lower and 'select' not in title_lower:
+            # Исключаем меню и выбор карты (редактор отсечен выше)
+            if not keywords:
                 return "playing"
         
         return "menu"
@@ -484,6 +837,8 @@ class RelaxBot:
     
     def __init__(self):
         self.mouse = MouseController()
+        # Курсор двигаем напрямую через SetCursorPos, pynput - запасной вариант
+        self._set_cursor = _SETCURSORPOS if _SETCURSORPOS else self._set_cursor_pynput
         self.keyboard = KeyboardController()
         self.running = False
         self.paused = False
@@ -491,6 +846,14 @@ class RelaxBot:
         
         self.beatmap: Optional[OsuBeatmapParser] = None
         self.hit_objects: List[HitObject] = []
+        
+        # Поля объектов в параллельных массивах (см. _on_beatmap_loaded)
+        self.obj_times: List[float] = []
+        self.obj_end_times = array('d')
+        self.obj_xs = array('i')
+        self.obj_ys = array('i')
+        self.obj_types = array('b')
+        self.obj_slider_paths: List[Optional[Tuple[float, ...]]] = []
         self.start_time = 0.0
         self.temp_dir: Optional[str] = None
         
@@ -498,40 +861,54 @@ class RelaxBot:
         self.smooth_factor = 0.4
         self.dance_intensity = 0.5
         self.dance_style = "flow"
+        self.dance_style_idx = 0
         self.accuracy_mode = "perfect"
         
-        self.clicked_objects = set()
-        self.current_key = 'z'
-        self.current_vk = WindowsInputHelper.VK_Z
+        # Обработанные объекты: байт на объект, индекс как в hit_objects
+        self.clicked_mask = bytearray()
+        self._vk_slot = 0
         self.key_pressed = False
-        self.active_slider = None
+        self.active_slider_idx = -1
+        # Время (time.perf_counter()) отпускания клавиш после кликов, разбирается в bot_loop
+        self._release_heap: List[float] = []
         self.spinner_rpm = 477.0
         
-        self.position_cache = deque(maxlen=10)
         self.last_update = 0.0
         self.target_fps = 120
         
         self.waiting_mode = False
         self.window_monitor = None
         self.osu_window = None
+        # (время проверки по time.monotonic(), активно ли окно osu!)
+        self._fg_cache = (0.0, True)
         
         # Улучшенная система движения курсора (как Auto mod)
-        self.current_position = [SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2]
-        self.target_position = [SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2]
-        self.velocity = [0.0, 0.0]
+        self.cx = float(SCREEN_WIDTH // 2)
+        self.cy = float(SCREEN_HEIGHT // 2)
+        self.vx = 0.0
+        self.vy = 0.0
+        self.tx = float(SCREEN_WIDTH // 2)
+        self.ty = float(SCREEN_HEIGHT // 2)
+        # Последняя отправленная в систему позиция курсора (-1 - еще не ставили)
+        self._last_set_x = -1
+        self._last_set_y = -1
         self.auto_acceleration = 3.5  # Ускорение как в Auto
         self.auto_friction = 0.85  # Трение для плавности
         self.arrival_threshold = 5  # Порог прибытия в пикселях
         
+        # Прогрев JIT, чтобы компиляция не попала на первый кадр игры
+        step_cursor_physics(0.0, 0.0, 0.0, 0.0, 100.0, 100.0,
+                            self.auto_acceleration, self.auto_friction, 5.0)
+        dance_offset(0, 0.0, 1.0)
+        
         # Проверка pywin32 для Windows API
-        self.has_pywin32 = False
-        try:
-            import win32gui
-            import win32process
-            self.has_pywin32 = True
-        except ImportError:
-            print("pywin32 не установлен. Используется упрощенный метод детекта.")
-            print("Установите: pip install pywin32 --break-system-packages")
+        self.has_pywin32 = HAS_PYWIN32
+        if not HAS_PYWIN32:
+            logger.warning("pywin32 не установлен. Используется упрощенный метод детекта. "
+                           "Установите: pip install pywin32 --break-system-packages")
+        
+        # Отложенные обновления виджетов из фоновых потоков: {виджет: {опция: значение}}
+        self._pending_status: Dict[tk.Widget, Dict[str, object]] = {}
         
         self.create_modern_gui()
         
@@ -559,6 +936,27 @@ class RelaxBot:
         style = ttk.Style()
         style.theme_use('clam')
         
+        # Шрифты создаются один раз и передаются виджетам по ссылке
+        # (объекты держим в self.fonts: при сборке мусора Tk удалит шрифт)
+        self.fonts = {
+            "small": tkfont.Font(self.root, family="Segoe UI", size=8),
+            "small_bold": tkfont.Font(self.root, family="Segoe UI", size=8, weight="bold"),
+            "normal": tkfont.Font(self.root, family="Segoe UI", size=9),
+            "bold": tkfont.Font(self.root, family="Segoe UI", size=9, weight="bold"),
+            "large": tkfont.Font(self.root, family="Segoe UI", size=10),
+            "large_bold": tkfont.Font(self.root, family="Segoe UI", size=10, weight="bold"),
+            "title": tkfont.Font(self.root, family="Segoe UI", size=12, weight="bold"),
+        }
+        
+        # Общие опции виджетов - через базу опций Tk, а не в каждом конструкторе
+        self.root.option_add("*Font", self.fonts["normal"])
+        self.root.option_add("*Button.foreground", fg_color)
+        self.root.option_add("*Button.relief", tk.FLAT)
+        self.root.option_add("*Button.cursor", "hand2")
+        self.root.option_add("*Entry.background", "#3a3a3a")
+        self.root.option_add("*Entry.foreground", fg_color)
+        self.root.option_add("*Entry.relief", tk.FLAT)
+        
         # Заголовок (фиксированный)
         header = tk.Frame(self.root, bg=accent_color, height=60)
         header.pack(fill=tk.X)
@@ -569,7 +967,7 @@ class RelaxBot:
             text="osu! Relax Bot v3.1\n[Window Detection]" + (" [ADMIN]" if is_admin() else ""),
             bg=accent_color,
             fg="#ffffff",
-            font=("Segoe UI", 12, "bold"),
+            font=self.fonts["title"],
             justify=tk.CENTER
         )
         title_label.pack(pady=8)
@@ -586,7 +984,7 @@ class RelaxBot:
                 text="Требуются права администратора для работы с osu!lazer",
                 bg="#ff3333",
                 fg="#ffffff",
-                font=("Segoe UI", 8),
+                font=self.fonts["small"],
                 wraplength=360
             ).pack(pady=3)
         
@@ -598,7 +996,7 @@ class RelaxBot:
                 text="ОБЯЗАТЕЛЬНО установите pywin32: pip install pywin32",
                 bg="#ffaa00",
                 fg="#000000",
-                font=("Segoe UI", 8, "bold"),
+                font=self.fonts["small_bold"],
                 wraplength=360
             ).pack(pady=3)
         
@@ -649,7 +1047,7 @@ class RelaxBot:
             text="Мониторинг окна:",
             bg="#4a90e2",
             fg="#ffffff",
-            font=("Segoe UI", 9, "bold")
+            font=self.fonts["bold"]
         ).pack(anchor=tk.W, padx=10, pady=(5, 0))
         
         self.monitor_status_label = tk.Label(
@@ -657,7 +1055,6 @@ class RelaxBot:
             text="Не запущен",
             bg="#4a90e2",
             fg="#ffffff",
-            font=("Segoe UI", 9),
             wraplength=340,
             justify=tk.LEFT
         )
@@ -671,8 +1068,7 @@ class RelaxBot:
             status_frame,
             text="Статус:",
             bg=secondary_bg,
-            fg="#888888",
-            font=("Segoe UI", 9)
+            fg="#888888"
         ).pack(anchor=tk.W, padx=10, pady=(5, 0))
         
         self.status_label = tk.Label(
@@ -680,7 +1076,7 @@ class RelaxBot:
             text="Готов к работе",
             bg=secondary_bg,
             fg="#00ff88",
-            font=("Segoe UI", 10, "bold"),
+            font=self.fonts["large_bold"],
             wraplength=340,
             justify=tk.LEFT
         )
@@ -694,8 +1090,7 @@ class RelaxBot:
             beatmap_frame,
             text="Beatmap:",
             bg=secondary_bg,
-            fg="#888888",
-            font=("Segoe UI", 9)
+            fg="#888888"
         ).pack(anchor=tk.W, padx=10, pady=(5, 0))
         
         self.beatmap_label = tk.Label(
@@ -703,7 +1098,6 @@ class RelaxBot:
             text="Не загружен",
             bg=secondary_bg,
             fg="#aaaaaa",
-            font=("Segoe UI", 9),
             wraplength=340,
             justify=tk.LEFT
         )
@@ -714,10 +1108,7 @@ class RelaxBot:
             text="Загрузить Beatmap (.osu / .osz)",
             command=self.load_beatmap,
             bg=accent_color,
-            fg="#ffffff",
-            font=("Segoe UI", 10, "bold"),
-            relief=tk.FLAT,
-            cursor="hand2",
+            font=self.fonts["large_bold"],
             activebackground="#ff88bb"
         )
         load_btn.pack(fill=tk.X, pady=(0, 10))
@@ -728,7 +1119,7 @@ class RelaxBot:
             text="Настройки",
             bg=secondary_bg,
             fg=fg_color,
-            font=("Segoe UI", 9, "bold"),
+            font=self.fonts["bold"],
             relief=tk.FLAT
         )
         settings_frame.pack(fill=tk.X, pady=(0, 10))
@@ -736,17 +1127,17 @@ class RelaxBot:
         settings_grid = tk.Frame(settings_frame, bg=secondary_bg)
         settings_grid.pack(padx=10, pady=10)
         
-        tk.Label(settings_grid, text="Смещение (мс):", bg=secondary_bg, fg="#aaaaaa", font=("Segoe UI", 9)).grid(row=0, column=0, sticky=tk.W, pady=3)
+        tk.Label(settings_grid, text="Смещение (мс):", bg=secondary_bg, fg="#aaaaaa").grid(row=0, column=0, sticky=tk.W, pady=3)
         self.offset_var = tk.StringVar(value="0")
-        offset_entry = tk.Entry(settings_grid, textvariable=self.offset_var, bg="#3a3a3a", fg="#ffffff", width=10, relief=tk.FLAT, font=("Segoe UI", 9))
+        offset_entry = tk.Entry(settings_grid, textvariable=self.offset_var, width=10)
         offset_entry.grid(row=0, column=1, padx=(10, 0), pady=3)
         
-        tk.Label(settings_grid, text="Плавность:", bg=secondary_bg, fg="#aaaaaa", font=("Segoe UI", 9)).grid(row=1, column=0, sticky=tk.W, pady=3)
+        tk.Label(settings_grid, text="Плавность:", bg=secondary_bg, fg="#aaaaaa").grid(row=1, column=0, sticky=tk.W, pady=3)
         self.smooth_var = tk.StringVar(value="0.4")
-        smooth_entry = tk.Entry(settings_grid, textvariable=self.smooth_var, bg="#3a3a3a", fg="#ffffff", width=10, relief=tk.FLAT, font=("Segoe UI", 9))
+        smooth_entry = tk.Entry(settings_grid, textvariable=self.smooth_var, width=10)
         smooth_entry.grid(row=1, column=1, padx=(10, 0), pady=3)
         
-        tk.Label(settings_grid, text="Стиль танца:", bg=secondary_bg, fg="#aaaaaa", font=("Segoe UI", 9)).grid(row=2, column=0, sticky=tk.W, pady=3)
+        tk.Label(settings_grid, text="Стиль танца:", bg=secondary_bg, fg="#aaaaaa").grid(row=2, column=0, sticky=tk.W, pady=3)
         self.dance_style_var = tk.StringVar(value="flow")
         style_combo = ttk.Combobox(
             settings_grid,
@@ -754,11 +1145,11 @@ class RelaxBot:
             values=["flow", "wave", "circular", "sharp"],
             state="readonly",
             width=8,
-            font=("Segoe UI", 9)
+            font=self.fonts["normal"]
         )
         style_combo.grid(row=2, column=1, padx=(10, 0), pady=3)
         
-        tk.Label(settings_grid, text="Точность:", bg=secondary_bg, fg="#aaaaaa", font=("Segoe UI", 9)).grid(row=3, column=0, sticky=tk.W, pady=3)
+        tk.Label(settings_grid, text="Точность:", bg=secondary_bg, fg="#aaaaaa").grid(row=3, column=0, sticky=tk.W, pady=3)
         self.accuracy_var = tk.StringVar(value="perfect")
         accuracy_combo = ttk.Combobox(
             settings_grid,
@@ -766,10 +1157,24 @@ class RelaxBot:
             values=["perfect", "high", "medium"],
             state="readonly",
             width=8,
-            font=("Segoe UI", 9)
+            font=self.fonts["normal"]
         )
         accuracy_combo.grid(row=3, column=1, padx=(10, 0), pady=3)
         
+        self.debug_log_var = tk.BooleanVar(value=False)
+        debug_check = tk.Checkbutton(
+            settings_grid,
+            text="Отладочный лог",
+            variable=self.debug_log_var,
+            command=self.toggle_debug_log,
+            bg=secondary_bg,
+            fg="#aaaaaa",
+            selectcolor="#3a3a3a",
+            activebackground=secondary_bg,
+            activeforeground="#ffffff"
+        )
+        debug_check.grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=3)
+        
         # Кнопки управления
         control_frame = tk.Frame(main_frame, bg=bg_color)
         control_frame.pack(fill=tk.X, pady=(0, 5))
@@ -779,10 +1184,7 @@ class RelaxBot:
             text="Автостарт (Окно)",
             command=self.toggle_waiting,
             bg="#00cc66",
-            fg="#ffffff",
-            font=("Segoe UI", 10, "bold"),
-            relief=tk.FLAT,
-            cursor="hand2",
+            font=self.fonts["large_bold"],
             activebackground="#00dd77"
         )
         self.start_btn.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
@@ -792,10 +1194,7 @@ class RelaxBot:
             text="Стоп",
             command=self.stop,
             bg="#cc0000",
-            fg="#ffffff",
-            font=("Segoe UI", 10, "bold"),
-            relief=tk.FLAT,
-            cursor="hand2",
+            font=self.fonts["large_bold"],
             state=tk.DISABLED,
             activebackground="#dd0000"
         )
@@ -806,11 +1205,7 @@ class RelaxBot:
             main_frame,
             text="Тест мониторинга",
             command=self.test_window_monitor,
-            bg="#4a90e2",
-            fg="#ffffff",
-            font=("Segoe UI", 9),
-            relief=tk.FLAT,
-            cursor="hand2"
+            bg="#4a90e2"
         )
         test_btn.pack(fill=tk.X, pady=(0, 10))
         
@@ -823,7 +1218,7 @@ class RelaxBot:
             text="Insert: Автостарт | End: Стоп | Home: Пауза",
             bg=bg_color,
             fg="#ffaa00",
-            font=("Segoe UI", 9, "bold")
+            font=self.fonts["bold"]
         ).pack()
         
         tk.Label(
@@ -831,7 +1226,7 @@ class RelaxBot:
             text="Мониторинг заголовка окна osu! (требует pywin32)",
             bg=bg_color,
             fg="#4a90e2",
-            font=("Segoe UI", 8, "bold")
+            font=self.fonts["small_bold"]
         ).pack()
         
         # Обновляем geometry после создания всех виджетов
@@ -848,6 +1243,26 @@ class RelaxBot:
         
         # Сохраняем canvas для возможности программной прокрутки
         self.canvas = canvas
+        
+        # Применение накопленных обновлений статуса не чаще 20 раз в секунду
+        self.root.after(50, self._flush_status)
+    
+    def _queue_config(self, widget, **options):
+        """Отложенный config виджета (безопасно вызывать из любого потока)"""
+        pending = self._pending_status
+        pending[widget] = {**pending.get(widget, {}), **options}
+    
+    def _flush_status(self):
+        """Применение накопленных обновлений в потоке Tk"""
+        pending = self._pending_status
+        while pending:
+            widget, options = pending.popitem()
+            widget.config(**options)
+        self.root.after(50, self._flush_status)
+    
+    def toggle_debug_log(self):
+        """Включение/выключение отладочного лога"""
+        logger.setLevel(logging.DEBUG if self.debug_log_var.get() else logging.WARNING)
     
     def test_window_monitor(self):
         """Тест мониторинга окна"""
@@ -855,8 +1270,6 @@ class RelaxBot:
             messagebox.showerror("Ошибка", "pywin32 не установлен!")
             return
         
-        import win32gui
-        
         try:
             hwnd = self._find_osu_window()
             if hwnd:
@@ -898,6 +1311,7 @@ class RelaxBot:
                 return
             
             self.hit_objects = self.beatmap.hit_objects
+            self._on_beatmap_loaded()
             
             title = self.beatmap.metadata.get('Title', 'Unknown')
             artist = self.beatmap.metadata.get('Artist', 'Unknown')
@@ -923,10 +1337,28 @@ class RelaxBot:
             temp_dir = tempfile.mkdtemp(prefix="osu_relax_")
             self.temp_dir = temp_dir
             
+            # Парсеру нужны только .osu - аудио, фоны и сториборд не распаковываем.
+            # Потоковая распаковка по одному файлу через один общий буфер
+            buf = bytearray(OSZ_COPY_BUFFER)
+            view = memoryview(buf)
             with zipfile.ZipFile(path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
+                for info in zip_ref.infolist():
+                    if info.is_dir() or not info.filename.endswith('.osu'):
+                        continue
+                    target = self._safe_extract_path(temp_dir, info.filename)
+                    if target is None:
+                        continue
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with zip_ref.open(info) as src, open(target, 'wb') as dst:
+                        while True:
+                            n = src.readinto(buf)
+                            if not n:
+                                break
+                            dst.write(view[:n])
             
-            osu_files = [f for f in os.listdir(temp_dir) if f.endswith('.osu')]
+            with os.scandir(temp_dir) as entries:
+                osu_files = [entry.name for entry in entries
+                             if entry.name.endswith('.osu') and entry.is_file()]
             
             if not osu_files:
                 return None
@@ -937,8 +1369,17 @@ class RelaxBot:
             return self.select_difficulty(temp_dir, osu_files)
             
         except Exception as e:
-            print(f"Ошибка распаковки: {e}")
+            logger.error("Ошибка распаковки: %s", e)
+            return None
+    
+    @staticmethod
+    def _safe_extract_path(root: str, name: str) -> Optional[str]:
+        """Путь распаковки внутри root; None для имен с '..' или абсолютных путей"""
+        root = os.path.realpath(root)
+        target = os.path.realpath(os.path.join(root, name))
+        if not target.startswith(root + os.sep):
             return None
+        return target
     
     def select_difficulty(self, temp_dir: str, files: List[str]) -> Optional[str]:
         """Выбор сложности"""
@@ -956,14 +1397,14 @@ class RelaxBot:
             text="Выберите сложность:",
             bg="#1e1e1e",
             fg="#ffffff",
-            font=("Segoe UI", 12, "bold")
+            font=self.fonts["title"]
         ).pack(pady=10)
         
         listbox = tk.Listbox(
             win,
             bg="#2d2d2d",
             fg="#ffffff",
-            font=("Segoe UI", 10),
+            font=self.fonts["large"],
             selectmode=tk.SINGLE,
             relief=tk.FLAT
         )
@@ -984,9 +1425,7 @@ class RelaxBot:
             text="Выбрать",
             command=on_select,
             bg="#00cc66",
-            fg="#ffffff",
-            font=("Segoe UI", 10, "bold"),
-            relief=tk.FLAT
+            font=self.fonts["large_bold"]
         ).pack(pady=(0, 10))
         
         listbox.bind('<Double-Button-1>', lambda e: on_select())
@@ -1008,23 +1447,41 @@ class RelaxBot:
         if not self.has_pywin32:
             return True  # Если нет pywin32, считаем что окно активно
         
+        # Активное окно меняется редко - результат проверки живет FOREGROUND_CACHE_TTL
+        now = time.monotonic()
+        checked_at, active = self._fg_cache
+        if now - checked_at < FOREGROUND_CACHE_TTL:
+            return active
+        
         try:
-            import win32gui
-            
             # Получаем активное окно
             hwnd = win32gui.GetForegroundWindow()
             if not hwnd:
-                return False
-            
-            # Получаем заголовок окна
-            title = win32gui.GetWindowText(hwnd).lower()
-            
-            # Проверяем, что это osu!
-            return 'osu!' in title or 'lazer' in title
+                active = False
+            else:
+                # Получаем заголовок окна
+                title = win32gui.GetWindowText(hwnd).lower()
+                
+                # Проверяем, что это osu!
+                active = 'osu!' in title or 'lazer' in title
             
         except Exception as e:
-            print(f"Ошибка проверки окна: {e}")
-            return True  # В случае ошибки продолжаем работу
+            logger.debug("Ошибка проверки окна: %s", e)
+            active = True  # В случае ошибки продолжаем работу
+        
+        self._fg_cache = (now, active)
+        return active
+    
+    def _on_beatmap_loaded(self):
+        """Привязка параллельных массивов объектов для главного цикла"""
+        beatmap = self.beatmap
+        # Времена обычным списком: bisect и индексация не создают float на каждое чтение
+        self.obj_times = beatmap.times.tolist()
+        self.obj_end_times = beatmap.end_times
+        self.obj_xs = beatmap.xs_screen
+        self.obj_ys = beatmap.ys_screen
+        self.obj_types = beatmap.types
+        self.obj_slider_paths = beatmap.slider_paths
     
     def toggle_waiting(self):
         """Переключение режима ожидания"""
@@ -1045,17 +1502,17 @@ class RelaxBot:
                 return
             
             self.waiting_mode = True
-            self.start_btn.config(text="Ожидание...", bg="#4a90e2")
-            self.status_label.config(text="Ожидание начала карты...", fg="#4a90e2")
-            self.monitor_status_label.config(text="Мониторинг активен - ожидание начала игры", fg="#ffffff")
+            self._queue_config(self.start_btn, text="Ожидание...", bg="#4a90e2")
+            self._queue_config(self.status_label, text="Ожидание начала карты...", fg="#4a90e2")
+            self._queue_config(self.monitor_status_label, text="Мониторинг активен - ожидание начала игры", fg="#ffffff")
             
             # Запуск мониторинга окна
             self.window_monitor = OsuWindowMonitor(callback=self.on_beatmap_detected)
             if not self.window_monitor.start():
                 self.waiting_mode = False
-                self.start_btn.config(text="Автостарт (Окно)", bg="#00cc66")
-                self.status_label.config(text="Ошибка запуска мониторинга", fg="#ff3333")
-                self.monitor_status_label.config(text="Не запущен", fg="#ffffff")
+                self._queue_config(self.start_btn, text="Автостарт (Окно)", bg="#00cc66")
+                self._queue_config(self.status_label, text="Ошибка запуска мониторинга", fg="#ff3333")
+                self._queue_config(self.monitor_status_label, text="Не запущен", fg="#ffffff")
                 messagebox.showerror("Ошибка", "Не удалось запустить мониторинг окна")
     
     def on_beatmap_detected(self, beatmap_name: str):
@@ -1063,8 +1520,8 @@ class RelaxBot:
         if not self.waiting_mode:
             return
         
-        print(f"Начало карты обнаружено: {beatmap_name}")
-        self.monitor_status_label.config(text=f"Обнаружена карта: {beatmap_name}", fg="#00ff88")
+        logger.info("Начало карты обнаружено: %s", beatmap_name)
+        self._queue_config(self.monitor_status_label, text=f"Обнаружена карта: {beatmap_name}", fg="#00ff88")
         
         # Небольшая задержка перед стартом (загрузка карты)
         time.sleep(0.5)
@@ -1078,13 +1535,14 @@ class RelaxBot:
             return
         
         if not self.hit_objects:
-            self.status_label.config(text="Загрузите beatmap!", fg="#ff3333")
+            self._queue_config(self.status_label, text="Загрузите beatmap!", fg="#ff3333")
             return
         
         try:
             self.offset_ms = float(self.offset_var.get())
             self.smooth_factor = float(self.smooth_var.get())
             self.dance_style = self.dance_style_var.get()
+            self.dance_style_idx = DANCE_STYLES.index(self.dance_style) if self.dance_style in DANCE_STYLES else 3
             self.accuracy_mode = self.accuracy_var.get()
         except ValueError:
             messagebox.showerror("Ошибка", "Некорректные значения настроек")
@@ -1093,30 +1551,34 @@ class RelaxBot:
         self.running = True
         self.paused = False
         self.waiting_mode = False
-        self.clicked_objects.clear()
-        self.current_key = 'z'
-        self.current_vk = WindowsInputHelper.VK_Z
+        self.clicked_mask = bytearray(len(self.hit_objects))
+        self._vk_slot = 0
         self.key_pressed = False
-        self.active_slider = None
-        self.position_cache.clear()
+        self.active_slider_idx = -1
+        self._release_heap = []
         
         # Инициализация физики курсора
         current_pos = self.mouse.position
-        self.current_position = [float(current_pos[0]), float(current_pos[1])]
-        self.target_position = [float(current_pos[0]), float(current_pos[1])]
-        self.velocity = [0.0, 0.0]
+        self.cx = float(current_pos[0])
+        self.cy = float(current_pos[1])
+        self.vx = 0.0
+        self.vy = 0.0
+        self.tx = float(current_pos[0])
+        self.ty = float(current_pos[1])
+        self._last_set_x = -1
+        self._last_set_y = -1
         
-        self.start_time = time.time() * 1000 - (self.offset_ms if self.hit_objects else 0)
+        self.start_time = time.perf_counter() * 1000 - (self.offset_ms if self.hit_objects else 0)
         
-        self.start_btn.config(text="Пауза", bg="#ffaa00", state=tk.NORMAL)
-        self.stop_btn.config(state=tk.NORMAL)
-        self.status_label.config(text="Бот запущен!", fg="#00ff88")
+        self._queue_config(self.start_btn, text="Пауза", bg="#ffaa00", state=tk.NORMAL)
+        self._queue_config(self.stop_btn, state=tk.NORMAL)
+        self._queue_config(self.status_label, text="Бот запущен!", fg="#00ff88")
         
         self.thread = threading.Thread(target=self.bot_loop, daemon=True)
         self.thread.start()
         
-        print(f"Бот запущен! Объектов: {len(self.hit_objects)}, Offset: {self.offset_ms}ms")
-        print(f"Физика курсора: acceleration={self.auto_acceleration}, friction={self.auto_friction}")
+        logger.info("Бот запущен! Объектов: %d, Offset: %sms", len(self.hit_objects), self.offset_ms)
+        logger.debug("Физика курсора: acceleration=%s, friction=%s", self.auto_acceleration, self.auto_friction)
     
     def toggle_pause(self):
         """Пауза/Продолжить"""
@@ -1126,180 +1588,206 @@ class RelaxBot:
         self.paused = not self.paused
         
         if self.paused:
-            self.start_btn.config(text="Продолжить", bg="#00cc66")
-            self.status_label.config(text="Пауза", fg="#ffaa00")
+            self._queue_config(self.start_btn, text="Продолжить", bg="#00cc66")
+            self._queue_config(self.status_label, text="Пауза", fg="#ffaa00")
+            self._release_heap = []
             if self.key_pressed:
-                WindowsInputHelper.release_key(self.current_vk)
+                WindowsInputHelper.release_key(_VKS[self._vk_slot])
                 self.key_pressed = False
         else:
-            self.start_btn.config(text="Пауза", bg="#ffaa00")
-            self.status_label.config(text="Бот работает", fg="#00ff88")
+            self._queue_config(self.start_btn, text="Пауза", bg="#ffaa00")
+            self._queue_config(self.status_label, text="Бот работает", fg="#00ff88")
     
     def stop(self):
         """Остановка бота"""
         self.running = False
         self.waiting_mode = False
         self.paused = False
+        self._release_heap = []
         
         if self.key_pressed:
-            WindowsInputHelper.release_key(self.current_vk)
+            WindowsInputHelper.release_key(_VKS[self._vk_slot])
             self.key_pressed = False
         
         if self.window_monitor:
             self.window_monitor.stop()
             self.window_monitor = None
         
-        self.start_btn.config(text="Автостарт (Окно)", bg="#00cc66", state=tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
-        self.status_label.config(text="Остановлен", fg="#ff3333")
-        self.monitor_status_label.config(text="Не запущен", fg="#ffffff")
+        self._queue_config(self.start_btn, text="Автостарт (Окно)", bg="#00cc66", state=tk.NORMAL)
+        self._queue_config(self.stop_btn, state=tk.DISABLED)
+        self._queue_config(self.status_label, text="Остановлен", fg="#ff3333")
+        self._queue_config(self.monitor_status_label, text="Не запущен", fg="#ffffff")
         
-        print("Бот остановлен")
+        logger.info("Бот остановлен")
     
     def bot_loop(self):
         """Главный цикл бота"""
         frame_time = 1.0 / self.target_fps
+        hit_objects = self.hit_objects
+        obj_times = self.obj_times
+        n_objects = len(obj_times)
+        obj_end_times = self.obj_end_times
+        obj_types = self.obj_types
+        obj_xs = self.obj_xs
+        obj_ys = self.obj_ys
+        obj_slider_paths = self.obj_slider_paths
+        clicked_mask = self.clicked_mask
+        start_time = self.start_time
+        
+        # Глобальные функции и методы - в локальные переменные (LOAD_FAST в горячем цикле)
+        perf_counter = time.perf_counter
+        sleep = time.sleep
+        bisect_left = bisect.bisect_left
+        bisect_right = bisect.bisect_right
+        heappop = heapq.heappop
+        is_osu_window_active = self.is_osu_window_active
+        calculate_target_position = self.calculate_target_position
+        update_cursor_physics = self.update_cursor_physics
+        should_click = self.should_click
+        release_key = self.release_key
+        
+        # Кадры по абсолютным дедлайнам: погрешность sleep не накапливается
+        next_tick = perf_counter()
         
         while self.running:
             if self.paused:
-                time.sleep(0.05)
+                sleep(0.05)
                 continue
             
+            # Отпускаем клавиши, у которых подошло время
+            release_heap = self._release_heap
+            now = perf_counter()
+            while release_heap and release_heap[0] <= now:
+                heappop(release_heap)
+                release_key()
+            
             # Проверяем, активно ли окно osu!
-            if not self.is_osu_window_active():
-                time.sleep(0.1)
+            if not is_osu_window_active():
+                # Ждем фокуса, но не дольше, чем до ближайшего отпускания клавиши
+                wait_time = 0.1
+                if release_heap:
+                    wait_time = min(wait_time, release_heap[0] - now)
+                if wait_time > 0:
+                    sleep(wait_time)
                 continue
             
-            loop_start = time.time()
-            current_time = (time.time() * 1000) - self.start_time
+            current_time = perf_counter() * 1000 - start_time
             
             # Обработка объектов
+            # Объекты отсортированы по времени: окно видимости [-200, 800] мс - два бинарных поиска
+            first = bisect_left(obj_times, current_time - 200)
+            last = bisect_right(obj_times, current_time + 800)
+            # Ближайший по времени объект ищем в том же проходе, без сортировки
             active_objects = []
-            for obj in self.hit_objects:
-                if obj.time in self.clicked_objects:
+            nearest_idx = -1
+            nearest_abs = math.inf
+            for i in range(first, last):
+                if clicked_mask[i]:
                     continue
-                
-                time_diff = obj.time - current_time
-                
-                # Собираем активные объекты (в пределах видимости)
-                if -200 <= time_diff <= 800:
-                    active_objects.append((obj, time_diff))
+                time_diff = obj_times[i] - current_time
+                active_objects.append((i, time_diff))
+                abs_diff = -time_diff if time_diff < 0 else time_diff
+                if abs_diff < nearest_abs:
+                    nearest_abs = abs_diff
+                    nearest_idx = i
             
             # Определяем целевую позицию (как в Auto - движемся к ближайшему объекту)
-            if active_objects:
-                # Сортируем по времени до клика
-                active_objects.sort(key=lambda x: abs(x[1]))
-                nearest_obj, nearest_diff = active_objects[0]
-                
+            if nearest_idx >= 0:
                 # Рассчитываем целевую позицию с танцем
-                target_x, target_y = self.calculate_target_position(nearest_obj, current_time)
-                self.target_position = [target_x, target_y]
+                # Данные объекта берем из локальных ссылок: загрузка новой карты во время
+                # работы подменяет self.obj_*, но не массивы текущего прогона
+                self.tx, self.ty = calculate_target_position(
+                    obj_xs[nearest_idx], obj_ys[nearest_idx], hit_objects[nearest_idx],
+                    obj_times[nearest_idx] - current_time, current_time
+                )
             
             # Плавное движение курсора (физика как в Auto)
-            self.update_cursor_physics()
+            moved = update_cursor_physics()
+            
+            # Пауза в карте: курсор на месте, клавиша отпущена, видимых объектов нет -
+            # спим дольше кадра, но не дольше, чем до появления следующего объекта
+            if not active_objects and not moved and not self.key_pressed:
+                next_time = obj_times[last] if last < n_objects else math.inf
+                idle_time = (next_time - 800 - current_time) / 1000.0
+                if idle_time > frame_time:
+                    sleep(min(IDLE_SLEEP, idle_time))
+                    next_tick = perf_counter()
+                    continue
             
             # Обработка кликов
-            for obj, time_diff in active_objects:
-                if obj.type == 1:  # Hit Circle
-                    if self.should_click(obj, current_time):
-                        self.click_circle(obj)
-                        self.clicked_objects.add(obj.time)
+            for i, time_diff in active_objects:
+                obj_type = obj_types[i]
+                if obj_type == 1:  # Hit Circle
+                    if should_click(time_diff):
+                        self.click_circle(hit_objects[i])
+                        clicked_mask[i] = 1
                 
-                elif obj.type == 2:  # Slider
-                    if self.should_click(obj, current_time):
-                        if not self.active_slider:
-                            self.start_slider(obj)
-                            self.clicked_objects.add(obj.time)
+                elif obj_type == 2:  # Slider
+                    if should_click(time_diff):
+                        if self.active_slider_idx < 0:
+                            self.start_slider(i)
+                            clicked_mask[i] = 1
                     
-                    if self.active_slider and self.active_slider.time == obj.time:
-                        if current_time >= obj.end_time:
+                    if self.active_slider_idx == i:
+                        if current_time >= obj_end_times[i]:
                             self.end_slider()
                         else:
-                            slider_pos = self.get_slider_position(obj, current_time)
-                            if slider_pos:
-                                self.target_position = list(slider_pos)
+                            self.follow_slider(obj_slider_paths[i], current_time)
                 
-                elif obj.type == 8:  # Spinner
-                    if time_diff <= 0 and current_time < obj.end_time:
+                elif obj_type == 8:  # Spinner
+                    end_time = obj_end_times[i]
+                    if time_diff <= 0 and current_time < end_time:
                         if not self.key_pressed:
                             self.press_key()
                         self.spin_cursor(current_time)
-                    elif current_time >= obj.end_time and obj.time not in self.clicked_objects:
+                    elif current_time >= end_time:
                         if self.key_pressed:
-                            self.release_key()
-                        self.clicked_objects.add(obj.time)
+                            release_key()
+                        clicked_mask[i] = 1
             
-            # Ограничение FPS
-            elapsed = time.time() - loop_start
-            if elapsed < frame_time:
-                time.sleep(frame_time - elapsed)
+            # Ограничение FPS (но не дольше, чем до ближайшего отпускания клавиши)
+            next_tick += frame_time
+            now = perf_counter()
+            if next_tick < now:
+                # Отстали (пауза, неактивное окно) - не догоняем пачкой кадров
+                next_tick = now
+            sleep_time = next_tick - now
+            if self._release_heap:
+                sleep_time = min(sleep_time, self._release_heap[0] - now)
+            if sleep_time > 0:
+                sleep(sleep_time)
     
     def update_cursor_physics(self):
         """
         Обновление физики курсора (как в Auto mode osu!)
         Использует acceleration и friction для плавного движения
         """
-        # Вектор до цели
-        dx = self.target_position[0] - self.current_position[0]
-        dy = self.target_position[1] - self.current_position[1]
-        
-        # Расстояние до цели
-        distance = math.sqrt(dx*dx + dy*dy)
-        
-        if distance < self.arrival_threshold:
-            # Мы уже на месте
-            return
-        
-        # Нормализованный вектор направления
-        if distance > 0:
-            dir_x = dx / distance
-            dir_y = dy / distance
-        else:
-            dir_x = 0
-            dir_y = 0
-        
-        # Применяем ускорение (как в Auto)
-        acceleration_strength = min(distance / 100.0, 1.0) * self.auto_acceleration
-        
-        self.velocity[0] += dir_x * acceleration_strength
-        self.velocity[1] += dir_y * acceleration_strength
-        
-        # Применяем трение (для плавности)
-        self.velocity[0] *= self.auto_friction
-        self.velocity[1] *= self.auto_friction
-        
-        # Ограничиваем максимальную скорость
-        max_speed = 50.0
-        speed = math.sqrt(self.velocity[0]**2 + self.velocity[1]**2)
-        if speed > max_speed:
-            scale = max_speed / speed
-            self.velocity[0] *= scale
-            self.velocity[1] *= scale
-        
-        # Обновляем позицию
-        self.current_position[0] += self.velocity[0]
-        self.current_position[1] += self.velocity[1]
-        
-        # Плавное торможение при приближении к цели
-        if distance < 50:
-            decel_factor = distance / 50.0
-            self.velocity[0] *= decel_factor
-            self.velocity[1] *= decel_factor
+        cx, cy, vx, vy, moved = step_cursor_physics(
+            self.cx, self.cy, self.vx, self.vy,
+            float(self.tx), float(self.ty),
+            self.auto_acceleration, self.auto_friction, float(self.arrival_threshold)
+        )
+        if not moved:
+            return False
         
-        # Ограничиваем координаты экрана
-        self.current_position[0] = max(0, min(SCREEN_WIDTH, self.current_position[0]))
-        self.current_position[1] = max(0, min(SCREEN_HEIGHT, self.current_position[1]))
+        self.cx, self.cy, self.vx, self.vy = cx, cy, vx, vy
         
-        # Устанавливаем курсор
-        self.mouse.position = (int(self.current_position[0]), int(self.current_position[1]))
+        # Устанавливаем курсор, только если сменился пиксель
+        x = int(cx)
+        y = int(cy)
+        if x != self._last_set_x or y != self._last_set_y:
+            self._last_set_x = x
+            self._last_set_y = y
+            self._set_cursor(x, y)
+        return True
+    
+    def _set_cursor_pynput(self, x: int, y: int):
+        """Установка курсора через pynput (не Windows)"""
+        self.mouse.position = (x, y)
     
-    def calculate_target_position(self, obj: HitObject, current_time: float) -> Tuple[int, int]:
+    def calculate_target_position(self, base_x: int, base_y: int, obj: HitObject,
+                                  time_until: float, current_time: float) -> Tuple[int, int]:
         """Расчет целевой позиции с плавным танцем (как Auto)"""
-        base_x = int(obj.x * SCALE_X)
-        base_y = int(obj.y * SCALE_Y)
-        
-        time_until = obj.time - current_time
-        
         # Если далеко до объекта - добавляем танец
         if time_until > 150:
             # Плавный танец (менее интенсивный, чем раньше)
@@ -1332,30 +1820,10 @@ class RelaxBot:
         distance_factor = min(time_until / 500.0, 1.0)
         intensity *= distance_factor
         
-        if self.dance_style == "flow":
-            # Плавные синусоидальные волны (классический Auto)
-            offset_x = int(math.sin(t * 1.2) * intensity)
-            offset_y = int(math.cos(t * 1.5) * intensity)
-        elif self.dance_style == "wave":
-            # Волновое движение
-            offset_x = int(math.sin(t * 1.5) * intensity)
-            offset_y = int(math.sin(t * 1.5 + math.pi/3) * intensity * 0.7)
-        elif self.dance_style == "circular":
-            # Круговое движение (как в Auto при ожидании)
-            radius = intensity * 0.8
-            offset_x = int(math.cos(t * 2) * radius)
-            offset_y = int(math.sin(t * 2) * radius)
-        else:  # sharp
-            # Резкие движения (но все еще плавнее старой версии)
-            offset_x = int(math.sin(t * 3) * intensity)
-            offset_y = int(math.cos(t * 2.5) * intensity)
-        
-        return (offset_x, offset_y)
-    
-    def should_click(self, obj: HitObject, current_time: float) -> bool:
-        """Определение момента клика"""
-        time_diff = obj.time - current_time
-        
+        return dance_offset(self.dance_style_idx, t, intensity)
+    
+    def should_click(self, time_diff: float) -> bool:
+        """Определение момента клика по времени до объекта"""
         if self.accuracy_mode == "perfect":
             return -PERFECT_WINDOW <= time_diff <= PERFECT_WINDOW
         elif self.accuracy_mode == "high":
@@ -1366,34 +1834,32 @@ class RelaxBot:
     def click_circle(self, obj: HitObject):
         """Клик по кругу"""
         self.press_key()
-        threading.Timer(0.05, self.release_key).start()
+        heapq.heappush(self._release_heap, time.perf_counter() + 0.05)
     
-    def start_slider(self, obj: HitObject):
+    def start_slider(self, index: int):
         """Начало слайдера"""
-        self.active_slider = obj
+        self.active_slider_idx = index
         self.press_key()
     
     def end_slider(self):
         """Конец слайдера"""
         self.release_key()
-        self.active_slider = None
+        self.active_slider_idx = -1
     
-    def get_slider_position(self, obj: HitObject, current_time: float) -> Optional[Tuple[int, int]]:
-        """Позиция на слайдере"""
-        if not obj.end_time:
-            return None
-        
-        progress = (current_time - obj.time) / (obj.end_time - obj.time)
-        progress = max(0.0, min(1.0, progress))
+    def follow_slider(self, path: Optional[Tuple[float, ...]], current_time: float):
+        """Перенос цели в текущую позицию на слайдере"""
+        if path is None:
+            return
         
-        # Упрощенная линейная интерполяция
-        if obj.slider_points and len(obj.slider_points) > 0:
-            end_point = obj.slider_points[0]
-            x = int((obj.x + (end_point[0] - obj.x) * progress) * SCALE_X)
-            y = int((obj.y + (end_point[1] - obj.y) * progress) * SCALE_Y)
-            return (x, y)
+        x0, y0, dx, dy, start, inv_duration = path
+        progress = (current_time - start) * inv_duration
+        if progress < 0.0:
+            progress = 0.0
+        elif progress > 1.0:
+            progress = 1.0
         
-        return (int(obj.x * SCALE_X), int(obj.y * SCALE_Y))
+        self.tx = int(x0 + dx * progress)
+        self.ty = int(y0 + dy * progress)
     
     def spin_cursor(self, current_time: float):
         """Вращение курсора для спиннера (плавное, как Auto)"""
@@ -1411,33 +1877,29 @@ class RelaxBot:
         target_y = int(center_y + actual_radius * math.sin(angle))
         
         # Используем физику для плавного движения
-        self.target_position = [target_x, target_y]
+        self.tx = target_x
+        self.ty = target_y
         
         # Для спиннера двигаемся быстрее
-        self.velocity[0] *= 0.95  # Меньше трение для спиннера
-        self.velocity[1] *= 0.95
+        self.vx *= 0.95  # Меньше трение для спиннера
+        self.vy *= 0.95
     
     def press_key(self):
         """Нажатие клавиши"""
         if not self.key_pressed:
-            WindowsInputHelper.press_key(self.current_vk)
+            WindowsInputHelper.press_key(_VKS[self._vk_slot])
             self.key_pressed = True
     
     def release_key(self):
         """Отпускание клавиши"""
         if self.key_pressed:
-            WindowsInputHelper.release_key(self.current_vk)
+            WindowsInputHelper.release_key(_VKS[self._vk_slot])
             self.key_pressed = False
             self.toggle_key()
     
     def toggle_key(self):
         """Чередование клавиш Z/X"""
-        if self.current_key == 'z':
-            self.current_key = 'x'
-            self.current_vk = WindowsInputHelper.VK_X
-        else:
-            self.current_key = 'z'
-            self.current_vk = WindowsInputHelper.VK_Z
+        self._vk_slot ^= 1
     
     def on_key_press(self, key):
         """Обработка горячих клавиш"""
@@ -1475,16 +1937,16 @@ class RelaxBot:
         self.root.destroy()
 
 if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s")
+    
     print("="*60)
     print("osu! Relax Bot v3.1 - Window Detection")
     print("="*60)
     
     # Проверка pywin32
-    try:
-        import win32gui
-        import win32process
+    if HAS_PYWIN32:
         print("pywin32 установлен")
-    except ImportError:
+    else:
         print("ВНИМАНИЕ: pywin32 не установлен!")
         print("   Автостарт работать не будет!")
         print("   Установите: pip install pywin32 --break-system-packages")